@@ -2,18 +2,24 @@
 """
 groq_bulk_generate_locale.py
 Generate bulk visitor messages from Groq in a specific locale/language.
+Several comma-separated locales run in parallel, one process per locale.
 
 Usage examples:
   # generate 5 messages per seed in Tamil
   python groq_bulk_generate_locale.py --locale ta-IN --per-seed 5 --kb 1
 
+  # Italian and Spanish side by side
+  python groq_bulk_generate_locale.py --locale it-IT,es-ES --per-seed 5
+
   # test prompt only (no API call)
   python groq_bulk_generate_locale.py --locale hi-IN --per-seed 1 --dry-run
 """
-import os, json, time, argparse, uuid, re
-import requests
+import os, argparse, asyncio, itertools, functools, multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import orjson
 from dotenv import load_dotenv
-from tenacity import retry, wait_exponential, stop_after_attempt, retry_if_exception_type
+from TestcaseTokens import (_cache_key, cache_get, cache_put, SemanticCache, JsonlWriter, compact_jsonl, count_records, _open_lines,
+                            _truncate_torn_tail, run, post_groq, _limiter, _token_bucket, _tokens_for_kb, record_usage, save_calibration)
 
 # load .env
 load_dotenv()
@@ -22,16 +28,11 @@ load_dotenv()
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 print("Key loaded:", bool(GROQ_API_KEY))
 
-GROQ_API_URL = os.getenv("GROQ_API_URL")
-print("Key loaded:", bool(GROQ_API_URL))
-
 DEFAULT_MODEL = os.getenv("GROQ_MODEL", "llama-3.1-8b-instant")
 
 if not GROQ_API_KEY:
     raise EnvironmentError("GROQ_API_KEY not found. Put it in .env or export it in the environment.")
 
-HEADERS = {"Authorization": f"Bearer {GROQ_API_KEY}", "Content-Type": "application/json"}
-
 # map locale -> human language instruction (extend as needed)
 LOCALE_TO_LANGUAGE = {
     "en-US": "English (United States)",
@@ -41,6 +42,12 @@ LOCALE_TO_LANGUAGE = {
     # add more locales as required
 }
 
+# control chars stripped by sanitize_text (everything below 0x20 except \t, \n, \r)
+_CTRL_TRANSTAB = str.maketrans("", "", "".join(chr(c) for c in list(range(0, 9)) + [11, 12] + list(range(14, 32))))
+
+# trace ids for prompts; a plain counter is enough to tell calls apart in the output
+_TRACE_IDS = itertools.count()
+
 DEFAULT_SEEDS = [
     "FAQ about warranty + order lookup + long complaint",
     "Order tracking long form and address correction",
@@ -48,144 +55,379 @@ DEFAULT_SEEDS = [
     "Product recommendation + warranty transfer request"
 ]
 
-def _tokens_for_kb(kb):
-    try:
-        return max(32, int(kb * 1024 // 4))
-    except:
-        return 256
-
-@retry(wait=wait_exponential(multiplier=1, min=1, max=10), stop=stop_after_attempt(3),
-       retry=retry_if_exception_type((requests.exceptions.RequestException,)))
-def call_groq(messages, model=DEFAULT_MODEL, max_tokens=256, timeout=120):
+async def call_groq(messages, model=DEFAULT_MODEL, max_tokens=256, timeout=120, variant=0, use_cache=True, alias_messages=None, locale=None, kb=None, calibrate=True):
+    """
+    Returns (response dict, True if it was served from the cache).
+    kb: pass it when max_tokens was sized from it, so the cache key doesn't drift with the calibration.
+    calibrate: feed the reply into the bytes/token calibration (off for batch replies, whose
+               JSON wrapping would skew it; the caller records just the messages instead).
+    """
     payload = {"model": model, "messages": messages, "max_tokens": max_tokens}
-    r = requests.post(GROQ_API_URL, json=payload, headers=HEADERS, timeout=timeout)
-    if not (200 <= r.status_code < 300):
-        # surface concise debug info (do not leak API key)
-        print("GROQ error:", r.status_code, r.text[:1000])
-        r.raise_for_status()
-    return r.json()
-
-def build_prompt(seed: str, locale: str, language_label: str, kb: int):
+    key = _cache_key(payload, variant, kb, locale)
+    if use_cache:
+        cached = cache_get(key)
+        # semantic cache: fall back to the response of an equivalent seed's prompt
+        if cached is None and alias_messages is not None:
+            cached = cache_get(_cache_key({**payload, "messages": alias_messages}, variant, kb, locale))
+        if cached is not None:
+            return orjson.loads(cached), True
+    r = await post_groq(payload, timeout=timeout, attempts=3)
+    if use_cache:
+        cache_put(key, r.content)
+    resp = orjson.loads(r.content)
+    if calibrate:
+        record_usage(locale, resp)
+    return resp, False
+
+# Prompt layout invariant: everything that is identical across calls (system message, static
+# instruction) comes first and byte-for-byte unchanged; per-call content (seeds, batch size,
+# trace) only ever goes after it. Groq reuses the processed prefix of repeated prompts, so
+# putting anything variable before or inside the static part turns every call into a miss.
+SYSTEM_PROMPT = "You are a test-case generator for QA automation."
+
+# typed: kb=1 and kb=1.0 render differently ("~1 KB" vs "~1.0 KB") and must not share an entry
+@functools.lru_cache(maxsize=64, typed=True)
+def _build_static_instr(locale: str, language_label: str, kb: float):
     """
-    Returns a messages array suitable for Groq chat completion.
+    Instruction text shared by every prompt for a (locale, language, kb) run; only the seed
+    and trace vary per call. Memoized, so the exact same string object is reused across runs
+    (arguments are all hashable; nothing per-call such as seed or trace may go in here).
     """
     # force the LLM to produce outputs in the requested language ONLY
-    instr = (
+    return (
         f"Generate a single visitor message of approximately ~{kb} KB intended to test a customer support chatbot. "
-        f"The message must reflect the scenario: {seed}. "
+        "The message must reflect the scenario given in the Seed line below. "
         f"Include natural user content typical for customers: short paragraphs, multi-part questions, emotional phrases, emojis, "
         "repeated characters, a short code snippet (optional), and a small JSON block (optional). "
         f"**IMPORTANT**: Return the message ONLY in {language_label} (do not mix in other languages). "
         "Return the visitor message only — no commentary, no numbered explanation. "
     )
+
+def build_prompt(static_instr: str, seed: str, locale: str, counter: int):
+    """
+    Returns a messages array suitable for Groq chat completion.
+    """
     # include locale token to help tracing later
-    trace = f"[[LOCALE:{locale}]] [[TRACE:{uuid.uuid4().hex[:8]}]]"
-    user_prompt = instr + "\nSeed: " + seed + "\n\n" + trace
+    trace = f"[[LOCALE:{locale}]] [[TRACE:{counter:08x}]]"
+    user_prompt = static_instr + "\n\n---\nSeed: " + seed + "\n" + trace
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": user_prompt}
+    ]
+
+def build_batch_prompt(seeds_subset, locale: str, language_label: str, kb: float, k: int):
+    """
+    Returns a messages array asking for k messages in one call, returned as a JSON array
+    of {"seed", "message"} objects (one per entry of seeds_subset, in order).
+    """
+    # static part first (see the prompt layout invariant above); k and the seeds go after it
+    instr = (
+        f"Generate one independent visitor message per Seed line below, each of approximately ~{kb} KB, "
+        "intended to test a customer support chatbot. Message N must reflect the scenario given in Seed N. "
+        f"Include natural user content typical for customers: short paragraphs, multi-part questions, emotional phrases, emojis, "
+        "repeated characters, a short code snippet (optional), and a small JSON block (optional). "
+        f"**IMPORTANT**: Write every message ONLY in {language_label} (do not mix in other languages). "
+        'Return a JSON array of {"seed": "...", "message": "..."} objects, in seed order — '
+        "no commentary, no code fences. "
+    )
+    seed_lines = "\n".join(f"Seed {n}: {seed}" for n, seed in enumerate(seeds_subset, 1))
+    trace = f"[[LOCALE:{locale}]] [[TRACE:{next(_TRACE_IDS):08x}]]"
+    user_prompt = instr + "\n\n---\n" + seed_lines + f"\nReturn exactly {k} objects.\n" + trace
     return [
-        {"role": "system", "content": "You are a test-case generator for QA automation."},
+        {"role": "system", "content": SYSTEM_PROMPT},
         {"role": "user", "content": user_prompt}
     ]
 
+def _extract_text(resp):
+    """Assistant text from a chat-completion response (None if it has none)."""
+    text = None
+    if isinstance(resp, dict):
+        text = resp.get("output_text")
+        if not text:
+            choices = resp.get("choices") or []
+            if choices:
+                first = choices[0]
+                if isinstance(first, dict):
+                    msg = first.get("message") or {}
+                    text = msg.get("content") or msg.get("text")
+                elif isinstance(first, str):
+                    text = first
+    return text
+
+def _parse_batch(text, k):
+    """The k message strings of a batch reply, or None if the reply is not a JSON array of k messages."""
+    if not text:
+        return None
+    # tolerate code fences / stray prose around the array
+    start, end = text.find("["), text.rfind("]")
+    if start < 0 or end <= start:
+        return None
+    try:
+        items = orjson.loads(text[start:end + 1])
+    except orjson.JSONDecodeError:
+        return None
+    if not isinstance(items, list) or len(items) != k:
+        return None
+    messages = [item.get("message") if isinstance(item, dict) else None for item in items]
+    if not all(isinstance(m, str) and m for m in messages):
+        return None
+    return messages
+
 def sanitize_text(s: str, max_len=100000):
     if not s:
         return s
     # remove control chars
-    s = re.sub(r"[\x00-\x08\x0b\x0c\x0e-\x1f]", "", s)
+    s = s.translate(_CTRL_TRANSTAB)
     if len(s) > max_len:
         s = s[:max_len] + "\n\n...[truncated]"
     return s
 
-def generate_for_locale(locale: str, seeds, per_seed=1, kb=1, model=DEFAULT_MODEL, dry_run=False, out_file="generated_messages.json", throttle=0.5):
+async def generate_for_locale(locale: str, seeds, per_seed=1, kb=1, model=DEFAULT_MODEL, dry_run=False, out_file="generated_messages.jsonl", throttle=0.5, concurrency=16, use_cache=True, semantic_cache=False, batch_size=4):
     language_label = LOCALE_TO_LANGUAGE.get(locale, locale)
-    out = []
-    tokens = _tokens_for_kb(kb)
-    print(f"[groq] locale={locale} language={language_label} tokens/request~{tokens}")
+    # seed -> equivalent seed seen in an earlier run (only differs on a semantic-cache hit)
+    aliases = {}
+    if semantic_cache and use_cache and not dry_run:
+        sc = SemanticCache()
+        aliases = {seed: sc.resolve(seed) for seed in dict.fromkeys(seeds)}
+        print(f"[groq] semantic cache: {sum(a != s for s, a in aliases.items())}/{len(aliases)} seeds matched an earlier seed")
+    tokens = _tokens_for_kb(kb, locale)
+    print(f"[groq] locale={locale} language={language_label} tokens/request~{tokens} concurrency={concurrency}")
+    static_instr = _build_static_instr(locale, language_label, kb)
+
+    pairs = [(seed, i) for seed in seeds for i in range(per_seed)]
+
+    if dry_run:
+        # no network: preview the prompts that would be sent (one per batch of batch_size seeds),
+        # building each distinct one once; every message still gets a record for accounting
+        size = max(1, batch_size)
+        previews = {}
+        out = []
+        with JsonlWriter(out_file) as writer:
+            for n in range(0, len(pairs), size):
+                group = tuple(seed for seed, _ in pairs[n:n + size])
+                preview = previews.get(group)
+                if preview is None:
+                    if size == 1:
+                        messages = build_prompt(static_instr, group[0], locale, next(_TRACE_IDS))
+                    else:
+                        messages = build_batch_prompt(group, locale, language_label, kb, len(group))
+                    preview = previews[group] = messages[1]["content"][:800]
+                    print(f"[groq] {'seed' if size == 1 else f'batch of {len(group)}'}: {', '.join(repr(seed) for seed in group)}")
+                    print("DRY-RUN prompt preview:\n", preview, "...\n")
+                for seed in group:
+                    record = {"seed": seed, "visitor_message": None, "preview": preview, "locale": locale}
+                    writer.write(record)
+                    out.append(record)
+        print("Appended", writer.count, "entries to", out_file, "(total entries now:", count_records(out_file), ")")
+        return out
+
     total = len(seeds) * per_seed
     count = 0
-    for seed in seeds:
-        for i in range(per_seed):
+    # in-flight requests adapt to Groq's rate-limit headers, up to `concurrency`
+    _limiter.ceiling = concurrency
+
+    async def _one(seed, i):
+        nonlocal count
+        async with _limiter:
             count += 1
             print(f"[groq] ({count}/{total}) seed='{seed}' ({i+1}/{per_seed})")
-            messages = build_prompt(seed, locale, language_label, kb)
-            if dry_run:
-                # show a preview only
-                print("DRY-RUN prompt preview:\n", messages[1]["content"][:800], "...\n")
-                out.append({"seed": seed, "visitor_message": None, "preview": messages[1]["content"][:800], "locale": locale})
-                time.sleep(throttle)
-                continue
+            messages = build_prompt(static_instr, seed, locale, next(_TRACE_IDS))
             try:
-                resp = call_groq(messages, model=model, max_tokens=tokens)
+                alias = aliases.get(seed, seed)
+                alias_messages = build_prompt(static_instr, alias, locale, 0) if alias != seed else None
+                resp, cached = await call_groq(messages, model=model, max_tokens=tokens, variant=i,
+                                       use_cache=use_cache, alias_messages=alias_messages, locale=locale, kb=kb)
             except Exception as e:
                 print("Error calling Groq for seed:", seed, "err:", e)
-                out.append({"seed": seed, "visitor_message": None, "error": str(e), "locale": locale})
-                # small backoff
-                time.sleep(max(throttle, 1.0))
-                continue
+                # small backoff before releasing the slot
+                await asyncio.sleep(max(throttle, 1.0))
+                return {"seed": seed, "visitor_message": None, "error": str(e), "locale": locale}
 
             # parse
-            text = None
-            if isinstance(resp, dict):
-                text = resp.get("output_text")
-                if not text:
-                    choices = resp.get("choices") or []
-                    if choices:
-                        first = choices[0]
-                        if isinstance(first, dict):
-                            msg = first.get("message") or {}
-                            text = msg.get("content") or msg.get("text")
-                        elif isinstance(first, str):
-                            text = first
+            text = _extract_text(resp)
             if not text:
                 text = str(resp)[:200000]
             text = sanitize_text(text)
             # attach metadata
-            out.append({
+            return {
                 "seed": seed,
                 "visitor_message": text,
                 "locale": locale,
                 "model": model,
-                "tokens_requested": tokens
-            })
-            # throttle to respect rate limits
-            time.sleep(throttle)
-    # write file (append if exists)
+                "tokens_requested": tokens,
+                "cached": cached
+            }
+
+    async def _write(seed, i):
+        record = await _one(seed, i)
+        writer.write(record, flush="error" in record)
+        return record
+
+    async def _batch(b, group):
+        """One call for a group of (seed, i) pairs; falls back to single calls if the reply can't be split."""
+        nonlocal count
+        k = len(group)
+        async with _limiter:
+            count += k
+            print(f"[groq] ({count}/{total}) batch of {k}: {', '.join(repr(seed) for seed, _ in group)}")
+            messages = build_batch_prompt([seed for seed, _ in group], locale, language_label, kb, k)
+            try:
+                resp, cached = await call_groq(messages, model=model, max_tokens=k * tokens + 128, variant=b,
+                                       use_cache=use_cache, locale=locale, kb=kb, calibrate=False)
+            except Exception as e:
+                print("Error calling Groq for batch:", b, "err:", e)
+                await asyncio.sleep(max(throttle, 1.0))
+                records = [{"seed": seed, "visitor_message": None, "error": str(e), "locale": locale} for seed, _ in group]
+                for record in records:
+                    writer.write(record, flush=True)
+                return records
+            texts = _parse_batch(_extract_text(resp), k)
+        if texts is None:
+            print(f"[groq] batch {b} reply was not a JSON array of {k} messages; retrying one seed per call")
+            count -= k
+            return list(await asyncio.gather(*[_write(seed, i) for seed, i in group]))
+        if not cached:
+            # calibrate on the messages alone, without the array's seeds, keys and escapes
+            record_usage(locale, resp, "".join(texts))
+        records = [{
+            "seed": seed,
+            "visitor_message": sanitize_text(text),
+            "locale": locale,
+            "model": model,
+            "tokens_requested": tokens,
+            "cached": cached
+        } for (seed, _), text in zip(group, texts)]
+        if use_cache:
+            # also file each message under its single-prompt key, where semantic-cache alias lookups
+            # (and the one-seed-per-call path) look for it
+            for (seed, i), text in zip(group, texts):
+                messages = build_prompt(static_instr, seed, locale, 0)
+                cache_put(_cache_key({"model": model, "messages": messages, "max_tokens": tokens}, i, kb, locale),
+                          orjson.dumps({"choices": [{"message": {"role": "assistant", "content": text}}]}))
+        for record in records:
+            writer.write(record)
+        return records
+
+    if batch_size <= 1:
+        batched, single = [], pairs
+    else:
+        # seeds mapped onto an earlier seed by the semantic cache stay single so they can reuse its responses
+        batched = [p for p in pairs if aliases.get(p[0], p[0]) == p[0]]
+        single = [p for p in pairs if aliases.get(p[0], p[0]) != p[0]]
+    groups = [batched[n:n + batch_size] for n in range(0, len(batched), batch_size)]
+
+    # append records as they complete instead of rewriting the whole file
+    with JsonlWriter(out_file) as writer:
+        try:
+            tasks = [_batch(b, group) for b, group in enumerate(groups)]
+            tasks += [_write(seed, i) for seed, i in single]
+            # gather keeps results in submission order regardless of completion order
+            results = await asyncio.gather(*tasks)
+            out = [rec for res in results[:len(groups)] for rec in res] + list(results[len(groups):])
+        finally:
+            save_calibration()
+    print("Appended", writer.count, "entries to", out_file, "(total entries now:", count_records(out_file), ")")
+    return out
+
+def _run_one(locale, seeds, kwargs, share=1.0):
+    # process-pool entry point: each worker runs its own event loop, HTTP client and token
+    # bucket, the latter scaled to the worker's share of the key's token quota
+    _token_bucket.share = share
+    # the part file is appended to; start it empty so leftovers of an aborted run aren't merged twice
+    for path in (kwargs["out_file"], kwargs["out_file"] + ".index"):
+        if os.path.exists(path):
+            os.remove(path)
+    return run(generate_for_locale(locale=locale, seeds=seeds, **kwargs))
+
+def generate_all_locales(locales, seeds, out_file="generated_messages.jsonl", concurrency=16, **kwargs):
+    """
+    Runs generate_for_locale for every locale in its own process, each writing
+    generated_<locale>.jsonl, then appends those files to out_file in locale order.
+    concurrency and the token quota are split across the workers since they share one Groq key.
+    If a worker fails, the records written so far are still merged before the error is raised.
+    """
+    out_dir = os.path.dirname(out_file)
+    ext = ".jsonl.zst" if out_file.endswith(".zst") else ".jsonl"
+    parts = {loc: os.path.join(out_dir, f"generated_{loc}{ext}") for loc in locales}
+    per_worker = max(1, concurrency // len(locales))
+    out = []
     try:
-        existing = []
-        if os.path.exists(out_file):
-            with open(out_file, "r", encoding="utf-8") as f:
-                existing = json.load(f)
-        combined = existing + out
-        with open(out_file, "w", encoding="utf-8") as f:
-            json.dump(combined, f, ensure_ascii=False, indent=2)
-        print("Wrote", out_file, " (total entries now:", len(combined), ")")
-    except Exception as e:
-        print("Failed to write output file:", e)
+        # spawn rather than fork: workers must not inherit the parent's SQLite connection
+        with ProcessPoolExecutor(max_workers=len(locales), mp_context=multiprocessing.get_context("spawn")) as ex:
+            futures = [ex.submit(_run_one, loc, seeds, dict(kwargs, out_file=parts[loc], concurrency=per_worker),
+                                 1 / len(locales))
+                       for loc in locales]
+            for fut in futures:
+                out.extend(fut.result())
+    finally:
+        with JsonlWriter(out_file) as writer:
+            for loc in locales:
+                if not os.path.exists(parts[loc]):
+                    continue
+                # a worker that died mid-write can leave a torn last record
+                _truncate_torn_tail(parts[loc])
+                with _open_lines(parts[loc]) as f:
+                    for line in f:
+                        if line.strip():
+                            writer.write_raw(line.rstrip(b"\n"))
+                os.remove(parts[loc])
+                if os.path.exists(parts[loc] + ".index"):
+                    os.remove(parts[loc] + ".index")
+        print("Merged", writer.count, "entries from", len(locales), "locales into", out_file,
+              "(total entries now:", count_records(out_file), ")")
     return out
 
 def parse_args_and_run():
     parser = argparse.ArgumentParser(description="Generate Groq messages per locale")
-    parser.add_argument("--locale", required=True, help="Locale code, e.g. ta-IN, hi-IN, en-GB")
+    parser.add_argument("--locale", help="Locale code, e.g. ta-IN, hi-IN, en-GB; comma-separate several to run them in parallel")
     parser.add_argument("--per-seed", type=int, default=3, help="Messages to generate per seed")
     parser.add_argument("--kb", type=float, default=1.0, help="Approx KB of each message (affects tokens)")
-    parser.add_argument("--out", default="generated_messages.json", help="Output JSON file")
+    parser.add_argument("--out", default="generated_messages.jsonl",
+                        help="Output JSON Lines file (appended to); a .jsonl.zst name writes it zstd-compressed")
     parser.add_argument("--dry-run", action="store_true", help="Print prompt preview without calling Groq")
     parser.add_argument("--seeds-file", help="Optional JSON file with custom seeds (array of strings)")
-    parser.add_argument("--throttle", type=float, default=1.5, help="Seconds to sleep between requests (increase to avoid 429)")
+    parser.add_argument("--throttle", type=float, default=1.5, help="Seconds to back off after a failed request")
+    parser.add_argument("--concurrency", type=int, default=16,
+                        help="Upper bound on concurrent Groq requests (starts at 2, adapts to rate-limit headers)")
     parser.add_argument("--model", default=DEFAULT_MODEL, help="Groq model id to use")
+    parser.add_argument("--no-cache", action="store_true", help="Always call Groq, bypassing the on-disk response cache")
+    parser.add_argument("--semantic-cache", action="store_true",
+                        help="Reuse cached responses of near-identical seeds (needs sentence-transformers + faiss-cpu)")
+    parser.add_argument("--batch-size", type=int, default=4,
+                        help="Messages requested per Groq call (1 = one call per message)")
+    parser.add_argument("--compact", "--export-json", dest="compact", action="store_true",
+                        help="Convert the --out JSON Lines file into a JSON array (<out>.json) and exit")
     args = parser.parse_args()
 
+    if args.compact:
+        dst = os.path.splitext(args.out[:-4] if args.out.endswith(".zst") else args.out)[0] + ".json"
+        if dst == args.out:
+            parser.error("--compact expects a .jsonl --out file")
+        compact_jsonl(args.out, dst)
+        print("Wrote", dst)
+        return
+    if not args.locale:
+        parser.error("--locale is required")
+
     if args.seeds_file:
-        with open(args.seeds_file, "r", encoding="utf-8") as f:
-            seeds = json.load(f)
+        with open(args.seeds_file, "rb") as f:
+            seeds = orjson.loads(f.read())
     else:
         seeds = DEFAULT_SEEDS
 
+    locales = [loc.strip() for loc in args.locale.split(",") if loc.strip()]
     # basic validation
-    if args.locale not in LOCALE_TO_LANGUAGE:
-        print(f"Warning: locale '{args.locale}' not in built map. Using locale label = locale code.")
+    for loc in locales:
+        if loc not in LOCALE_TO_LANGUAGE:
+            print(f"Warning: locale '{loc}' not in built map. Using locale label = locale code.")
     # call generate
-    generate_for_locale(locale=args.locale, seeds=seeds, per_seed=args.per_seed, kb=args.kb,
-                        model=args.model, dry_run=args.dry_run, out_file=args.out, throttle=args.throttle)
+    kwargs = dict(per_seed=args.per_seed, kb=args.kb, model=args.model, dry_run=args.dry_run,
+                  out_file=args.out, throttle=args.throttle, concurrency=args.concurrency,
+                  use_cache=not args.no_cache, semantic_cache=args.semantic_cache, batch_size=args.batch_size)
+    if len(locales) > 1:
+        generate_all_locales(locales, seeds, **kwargs)
+    else:
+        run(generate_for_locale(locale=locales[0], seeds=seeds, **kwargs))
 
 if __name__ == "__main__":
     parse_args_and_run()
@@ -1,8 +1,18 @@
 # rate_safe_groq.py  -- drop-in patches for your generator
-import os, json, time, requests
-from tenacity import retry, wait_exponential, stop_after_attempt, retry_if_exception_type
-import os, json, time, requests
+import os, io, re, time, struct, asyncio, hashlib, sqlite3, collections, functools
+import httpx
+import orjson
+import zstandard as zstd
+from tenacity import AsyncRetrying, wait_exponential, stop_after_attempt, retry_if_exception_type
 from dotenv import load_dotenv
+try:
+    # optional: only needed for the semantic cache (pip install sentence-transformers faiss-cpu)
+    import numpy as np
+    import faiss
+    from sentence_transformers import SentenceTransformer
+except ImportError:
+    faiss = None
+    SentenceTransformer = None
 load_dotenv()  # <-- THIS loads .env into environment variables
 
 
@@ -15,11 +25,522 @@ print("Key loaded:", bool(GROQ_API_URL))
 DEFAULT_MODEL = "llama-3.1-8b-instant"
 HEADERS = {"Authorization": f"Bearer {GROQ_API_KEY}", "Content-Type": "application/json"}
 
+# shared keep-alive HTTP/2 client, reused by every generator call on the same event loop so the
+# TCP/TLS session (and its one DNS lookup) is paid once; connections are bound to that loop
+_client = None
+_client_loop = None
 
+def get_client():
+    """Return the shared httpx client for the running event loop, creating it on first use."""
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client_loop is not loop:
+        _client = httpx.AsyncClient(http2=True, timeout=120, headers=HEADERS,
+                                    limits=httpx.Limits(max_keepalive_connections=20))
+        _client_loop = loop
+    return _client
 
-def _tokens_for_kb(kb):
-    # rough estimate: ~4 chars per token
-    return max(32, int(kb * 1024 // 4))
+async def close_client():
+    global _client, _client_loop
+    if _client is not None:
+        await _client.aclose()
+    _client = _client_loop = None
+
+def run(coro):
+    """asyncio.run(coro), then close the shared client inside the same loop."""
+    async def _main():
+        try:
+            return await coro
+        finally:
+            await close_client()
+    return asyncio.run(_main())
+
+# exact-match response cache: identical payloads are answered from disk instead of Groq
+CACHE_DB = os.getenv("GROQ_CACHE_DB", "groq_cache.sqlite")
+# generous timeout: per-locale worker processes share this file
+_cache = sqlite3.connect(CACHE_DB, timeout=30)
+_cache.execute("CREATE TABLE IF NOT EXISTS cache(k TEXT PRIMARY KEY, v BLOB, ts INTEGER)")
+_cache.commit()
+
+# per-call trace token appended to prompts; stripped before hashing
+_TRACE_RE = re.compile(r"\[\[TRACE:[^\]]*\]\]")
+
+def _cache_key(payload, variant=0, kb=None, locale=None):
+    """
+    SHA-256 of the canonical payload (trace token removed).
+    variant: index of the message within its seed, so per_seed > 1 still yields distinct messages.
+    kb, locale: when max_tokens was sized by _tokens_for_kb, hash these instead of it; the
+                calibrated bytes/token moves with every fresh response, so max_tokens would
+                change the key between otherwise identical runs.
+    """
+    messages = [dict(m) for m in payload["messages"]]
+    if len(messages) > 1:
+        messages[1]["content"] = _TRACE_RE.sub("", messages[1]["content"])
+    canon = {**payload, "messages": messages, "variant": variant}
+    if kb is not None:
+        del canon["max_tokens"]
+        canon["budget"] = {"kb": float(kb), "locale": locale}
+    return hashlib.sha256(orjson.dumps(canon, option=orjson.OPT_SORT_KEYS)).hexdigest()
+
+# cache values are zstd-compressed; reused across calls (this process is single-threaded)
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+_cache_cctx = zstd.ZstdCompressor(level=3)
+_cache_dctx = zstd.ZstdDecompressor()
+
+def cache_get(key):
+    row = _cache.execute("SELECT v FROM cache WHERE k=?", (key,)).fetchone()
+    if not row:
+        return None
+    # values written before compression was added are plain JSON
+    return _cache_dctx.decompress(row[0]) if row[0][:4] == _ZSTD_MAGIC else row[0]
+
+def cache_put(key, value: bytes):
+    _cache.execute("INSERT OR REPLACE INTO cache(k, v, ts) VALUES (?, ?, ?)",
+                   (key, _cache_cctx.compress(value), int(time.time())))
+    _cache.commit()
+
+# <path>.index holds one (offset, length) entry per record line of <path>; offsets are
+# into the uncompressed stream, so they mean the same for .jsonl and .jsonl.zst outputs
+_INDEX_ENTRY = struct.Struct("<QI")
+
+def _is_compressed(path):
+    return path.endswith(".zst")
+
+def _open_lines(path):
+    """Binary line iterator over a JSON Lines file, decompressing .zst (appended frames included)."""
+    f = open(path, "rb")
+    if not _is_compressed(path):
+        return f
+    return io.BufferedReader(zstd.ZstdDecompressor().stream_reader(f, read_across_frames=True, closefd=True))
+
+def _last_index_entry(index_path):
+    with open(index_path, "rb") as f:
+        f.seek(-_INDEX_ENTRY.size, os.SEEK_END)
+        return _INDEX_ENTRY.unpack(f.read())
+
+def _zst_frames_end(path):
+    """
+    (offset just past the last complete zstd frame, uncompressed size of the frames up to it).
+    Every flush writes a complete frame, so anything after that point is a frame torn by a crash.
+    """
+    dctx = zstd.ZstdDecompressor()
+    dobj = dctx.decompressobj()
+    end = size = pos = frame_size = 0
+    with open(path, "rb") as f:
+        for chunk in iter(functools.partial(f.read, 1024 * 1024), b""):
+            while chunk:
+                try:
+                    frame_size += len(dobj.decompress(chunk))
+                except zstd.ZstdError:
+                    return end, size
+                if not dobj.eof:
+                    pos += len(chunk)
+                    break
+                pos += len(chunk) - len(dobj.unused_data)
+                end, size = pos, size + frame_size
+                chunk, frame_size = dobj.unused_data, 0
+                dobj = dctx.decompressobj()
+    return end, size
+
+def _data_end(path):
+    """
+    (file offset, uncompressed size) of `path` up to the end of its last complete record line.
+    A crash during a buffered flush can leave a torn last line (or zstd frame) after it.
+    """
+    if not os.path.exists(path):
+        return 0, 0
+    if _is_compressed(path):
+        return _zst_frames_end(path)
+    with open(path, "rb") as f:
+        end = os.path.getsize(path)
+        while end > 0:
+            start = max(0, end - 64 * 1024)
+            f.seek(start)
+            nl = f.read(end - start).rfind(b"\n")
+            if nl >= 0:
+                return start + nl + 1, start + nl + 1
+            end = start
+    return 0, 0
+
+def _truncate_torn_tail(path):
+    """Drop a torn last record so the next append starts on a fresh line (or frame)."""
+    end, _ = _data_end(path)
+    if os.path.exists(path) and end < os.path.getsize(path):
+        print(f"[groq] {path}: dropping {os.path.getsize(path) - end} bytes of an incomplete last record")
+        os.truncate(path, end)
+
+def _index_is_current(path, index_path):
+    """True if the index covers exactly the records in `path` (its last entry ends at EOF)."""
+    has_data = os.path.exists(path) and os.path.getsize(path) > 0
+    if not os.path.exists(index_path):
+        return not has_data
+    size = os.path.getsize(index_path)
+    if size % _INDEX_ENTRY.size:
+        return False
+    if size == 0:
+        return not has_data
+    pos, length = _last_index_entry(index_path)
+    # compare against the last complete line, so a torn tail is never counted as a record
+    return has_data and pos + length + 1 == _data_end(path)[1]
+
+def _rebuild_index(path, index_path):
+    with open(index_path, "wb") as fidx:
+        if not os.path.exists(path):
+            return
+        with _open_lines(path) as fin:
+            pos = 0
+            try:
+                for line in fin:
+                    if not line.endswith(b"\n"):
+                        break  # torn last record
+                    if line.strip():
+                        fidx.write(_INDEX_ENTRY.pack(pos, len(line.rstrip(b"\n"))))
+                    pos += len(line)
+            except zstd.ZstdError:
+                pass  # torn last frame; the records before it are indexed
+
+def count_records(path):
+    """Number of records in a JSON Lines output file, read from its index (no parsing)."""
+    index_path = path + ".index"
+    if not _index_is_current(path, index_path):
+        _rebuild_index(path, index_path)
+    return os.path.getsize(index_path) // _INDEX_ENTRY.size
+
+class _ZstdFrameWriter:
+    """
+    Write-only sink that turns each flush() into one complete zstd frame appended to `raw`,
+    so every flushed prefix of the file is a valid run of frames and a crash only loses
+    the records written since the last flush.
+    """
+    def __init__(self, raw):
+        self._raw = raw
+        self._buf = bytearray()
+        # one compressor per stream; the cache's compressor may be in use concurrently
+        self._cctx = zstd.ZstdCompressor(level=3)
+
+    def write(self, data):
+        self._buf += data
+
+    def flush(self):
+        if self._buf:
+            self._raw.write(self._cctx.compress(bytes(self._buf)))
+            self._buf.clear()
+        self._raw.flush()
+
+    def close(self):
+        self.flush()
+        self._raw.close()
+
+class JsonlWriter:
+    """
+    Append-only JSON Lines writer: one record per line through a 128 KiB buffer,
+    flushed every `flush_every` records. Each run only writes its own records.
+    Alongside it keeps <path>.index with the (offset, length) of every record.
+    A path ending in .zst is written zstd-compressed, one complete frame per flush.
+    """
+    def __init__(self, path, flush_every=16, buffer_size=128 * 1024):
+        self.index_path = path + ".index"
+        _truncate_torn_tail(path)
+        if not _index_is_current(path, self.index_path):
+            _rebuild_index(path, self.index_path)
+        self._pos = 0
+        if os.path.exists(self.index_path) and os.path.getsize(self.index_path):
+            pos, length = _last_index_entry(self.index_path)
+            self._pos = pos + length + 1
+        raw = io.BufferedWriter(open(path, "ab", buffering=0), buffer_size=buffer_size)
+        self._fh = _ZstdFrameWriter(raw) if _is_compressed(path) else raw
+        self._index = io.BufferedWriter(open(self.index_path, "ab", buffering=0))
+        self.flush_every = flush_every
+        self.count = 0
+
+    def write(self, record, flush=False):
+        self.write_raw(orjson.dumps(record), flush)
+
+    def write_raw(self, data: bytes, flush=False):
+        """Append an already-serialized record (no trailing newline)."""
+        self._fh.write(data + b"\n")
+        self._index.write(_INDEX_ENTRY.pack(self._pos, len(data)))
+        self._pos += len(data) + 1
+        self.count += 1
+        if flush or self.count % self.flush_every == 0:
+            self.flush()
+
+    def flush(self):
+        self._fh.flush()
+        self._index.flush()
+
+    def close(self):
+        self._fh.close()
+        self._index.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def compact_jsonl(src, dst):
+    """Convert a JSON Lines file (optionally .zst) into a single JSON array, streaming one line at a time."""
+    with _open_lines(src) as fin, open(dst, "wb") as fout:
+        fout.write(b"[")
+        first = True
+        for line in fin:
+            line = line.strip()
+            if not line:
+                continue
+            fout.write(b"\n  " if first else b",\n  ")
+            fout.write(line)
+            first = False
+        fout.write(b"\n]\n")
+    return dst
+
+class SemanticCache:
+    """
+    Maps a seed onto a previously seen, near-identical seed (cosine similarity >= threshold)
+    so its cached responses can be reused. Seed embeddings live in the same SQLite DB as the
+    exact cache. Locale/kb/model are not embedded: reuse still goes through the exact cache
+    key, so a match only pays off when the equivalent seed was generated with the same settings.
+    """
+    def __init__(self, model_name="all-MiniLM-L6-v2", threshold=0.92):
+        if faiss is None or SentenceTransformer is None:
+            raise ImportError("Semantic cache requires: pip install sentence-transformers faiss-cpu")
+        self.model = SentenceTransformer(model_name)
+        self.threshold = threshold
+        self.index = faiss.IndexFlatIP(self.model.get_sentence_embedding_dimension())
+        self.seeds = []  # parallel to index rows
+        _cache.execute("CREATE TABLE IF NOT EXISTS seeds(seed TEXT PRIMARY KEY, vec BLOB)")
+        rows = _cache.execute("SELECT seed, vec FROM seeds").fetchall()
+        if rows:
+            self.index.add(np.stack([np.frombuffer(v, dtype="float32") for _, v in rows]))
+            self.seeds = [seed for seed, _ in rows]
+
+    def resolve(self, seed: str) -> str:
+        """Return the stored seed equivalent to `seed`, or register `seed` and return it unchanged."""
+        if seed in self.seeds:
+            return seed
+        vec = self.model.encode(seed, normalize_embeddings=True).astype("float32")
+        if self.index.ntotal:
+            D, I = self.index.search(vec[None], 1)
+            if D[0, 0] >= self.threshold:
+                return self.seeds[I[0, 0]]
+        self.index.add(vec[None])
+        self.seeds.append(seed)
+        _cache.execute("INSERT OR REPLACE INTO seeds(seed, vec) VALUES (?, ?)", (seed, vec.tobytes()))
+        _cache.commit()
+        return seed
+
+
+# UTF-8 bytes per completion token, per locale. "kb" is a byte size, and non-Latin scripts pack
+# fewer characters into a token but more bytes into a character, so a single chars/token guess
+# over- or under-shoots max_tokens depending on the language. Starting points only: measured
+# ratios from real responses (see record_usage) take over once available.
+_BYTES_PER_TOKEN = {
+    "en-US": 4.0,
+    "en-GB": 4.0,
+    "it-IT": 3.6,
+    "es-ES": 3.6,
+    "ta-IN": 3.0,
+    "hi-IN": 3.0,
+}
+CALIBRATION_FILE = os.getenv("GROQ_CALIBRATION_FILE", "token_calibration.json")
+_EMA_ALPHA = 0.2
+try:
+    with open(CALIBRATION_FILE, "rb") as f:
+        _calibration = orjson.loads(f.read())
+except (OSError, orjson.JSONDecodeError):
+    _calibration = {}
+
+def _bytes_per_token(locale=None):
+    return _calibration.get(locale) or _BYTES_PER_TOKEN.get(locale, 4.0)
+
+# memoized on the ratio itself rather than the locale, so calibration updates never leave a stale entry
+@functools.lru_cache(maxsize=64)
+def _tokens_for_ratio(kb, bytes_per_token):
+    try:
+        return max(32, int(kb * 1024 / bytes_per_token))
+    except (TypeError, ValueError):
+        return 256
+
+def _tokens_for_kb(kb, locale=None):
+    return _tokens_for_ratio(kb, _bytes_per_token(locale))
+
+def record_usage(locale, resp, text=None):
+    """
+    Fold the bytes/token ratio of a real (non-cached) response into the locale's running average.
+    text: the message content to measure, when it isn't the whole reply (e.g. split out of a batch).
+    """
+    try:
+        tokens = resp["usage"]["completion_tokens"]
+        if text is None:
+            text = resp["choices"][0]["message"]["content"]
+    except (KeyError, IndexError, TypeError):
+        return
+    if not locale or not tokens or not text:
+        return
+    # clamp so one odd response can't wreck the estimate
+    ratio = min(8.0, max(1.0, len(text.encode("utf-8")) / tokens))
+    prev = _bytes_per_token(locale)
+    _calibration[locale] = round((1 - _EMA_ALPHA) * prev + _EMA_ALPHA * ratio, 3)
+    _calibrated.add(locale)
+
+# locales measured by this process; only these are written back, so parallel runs don't clobber each other
+_calibrated = set()
+
+def save_calibration():
+    if not _calibrated:
+        return
+    try:
+        with open(CALIBRATION_FILE, "rb") as f:
+            merged = orjson.loads(f.read())
+    except (OSError, orjson.JSONDecodeError):
+        merged = {}
+    merged.update({locale: _calibration[locale] for locale in _calibrated})
+    with open(CALIBRATION_FILE, "wb") as f:
+        f.write(orjson.dumps(merged, option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS))
+
+# rate-limit durations look like "59.34s", "2m30s" or "420ms"
+_DURATION_RE = re.compile(r"(?:(\d+)h)?(?:(\d+)m(?!s))?(?:([\d.]+)s)?(?:(\d+)ms)?")
+
+def _parse_duration(value):
+    """Seconds in a Groq reset header, or None if it cannot be parsed."""
+    if not value:
+        return None
+    m = _DURATION_RE.fullmatch(value.strip())
+    if not m or not any(m.groups()):
+        return None
+    h, mins, sec, ms = m.groups()
+    return int(h or 0) * 3600 + int(mins or 0) * 60 + float(sec or 0) + int(ms or 0) / 1000.0
+
+class TokenBucket:
+    """
+    Client-side mirror of Groq's per-minute token quota. Requests acquire() their estimated
+    token cost before posting, so we wait for capacity instead of running into 429s.
+    Sized from the first response's x-ratelimit-* headers; until then acquire() never waits.
+    share: fraction of the quota this process may spend (worker processes split one API key).
+    """
+    def __init__(self, capacity=None, refill_per_sec=None, share=1.0):
+        self.capacity = capacity
+        self.rate = refill_per_sec
+        self.tokens = capacity or 0.0
+        self.share = share
+        self._last = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        if self.rate:
+            self.tokens = min(self.capacity, self.tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    async def acquire(self, n):
+        if not self.capacity:
+            return
+        n = min(n, self.capacity)
+        while True:
+            self._refill()
+            if self.tokens >= n:
+                self.tokens -= n
+                return
+            await asyncio.sleep((n - self.tokens) / self.rate)
+
+    def update(self, remaining, limit=None, reset=None):
+        """Reconcile with the server's view; the server never gets to grant more than we think is left."""
+        if limit and not self.capacity:
+            used = limit - remaining
+            self.capacity = limit * self.share
+            # refill rate measured from the reset window, else assume the quota is per minute
+            self.rate = (used / reset if reset and used > 0 else limit / 60.0) * self.share
+            self.tokens = remaining * self.share
+            self._last = time.monotonic()
+            print(f"[groq] token bucket: capacity={self.capacity:.0f} refill={self.rate:.1f}/s")
+        else:
+            self._refill()
+            self.tokens = min(self.tokens, remaining * self.share)
+
+    def update_from_headers(self, headers):
+        try:
+            remaining = float(headers["x-ratelimit-remaining-tokens"])
+            limit = float(headers.get("x-ratelimit-limit-tokens") or 0) or None
+        except (KeyError, ValueError):
+            return
+        self.update(remaining, limit=limit, reset=_parse_duration(headers.get("x-ratelimit-reset-tokens")))
+
+# one bucket per process: the quota belongs to the API key, not to a generator run
+_token_bucket = TokenBucket()
+
+class AIMDLimiter:
+    """
+    Concurrency limit that adapts to Groq's request quota (additive increase, multiplicative
+    decrease): grows by about one slot per round of responses while x-ratelimit-remaining-requests
+    shows more than half the quota left and no 429 was seen recently; halves on a 429.
+    Used as `async with limiter:` around each job; `ceiling` is the caller's --concurrency.
+    """
+    def __init__(self, start=2, floor=1, ceiling=16, cooldown=10.0):
+        self.limit = float(start)
+        self.floor = floor
+        self.ceiling = ceiling
+        self.cooldown = cooldown  # seconds after a 429 with no increases
+        self.in_flight = 0
+        self._last_429 = float("-inf")
+        self._waiters = collections.deque()
+
+    @property
+    def n(self):
+        return max(self.floor, min(self.ceiling, int(self.limit)))
+
+    async def __aenter__(self):
+        while self.in_flight >= self.n:
+            fut = asyncio.get_running_loop().create_future()
+            self._waiters.append(fut)
+            await fut
+        self.in_flight += 1
+        return self
+
+    async def __aexit__(self, *exc):
+        self.in_flight -= 1
+        self._wake()
+
+    def _wake(self):
+        free = self.n - self.in_flight
+        while free > 0 and self._waiters:
+            fut = self._waiters.popleft()
+            if not fut.done():
+                fut.set_result(None)
+                free -= 1
+
+    def observe(self, r):
+        now = time.monotonic()
+        if r.status_code == 429:
+            # one decrease per burst: concurrent 429s from the same window count once
+            if now - self._last_429 > 1.0:
+                before = self.n
+                self.limit = max(self.floor, self.limit / 2)
+                if self.n != before:
+                    print(f"[groq] concurrency -> {self.n} (429)")
+            self._last_429 = now
+            return
+        if now - self._last_429 < self.cooldown:
+            return
+        try:
+            remaining = float(r.headers["x-ratelimit-remaining-requests"])
+            limit = float(r.headers["x-ratelimit-limit-requests"])
+        except (KeyError, ValueError):
+            return
+        if limit and remaining / limit > 0.5 and self.limit < self.ceiling:
+            before = self.n
+            self.limit = min(self.ceiling, self.limit + 1 / self.n)
+            if self.n != before:
+                print(f"[groq] concurrency -> {self.n}")
+                self._wake()
+
+# like the token bucket, one limiter per process; it keeps what it learned between runs
+_limiter = AIMDLimiter()
+
+def _estimate_tokens(payload):
+    # prompt (~4 chars per token) plus the completion budget
+    return payload["max_tokens"] + sum(len(m["content"]) for m in payload["messages"]) // 4
+
+# matched against the raw body bytes, so no decode or lowercased copy is needed
+_RETRY_MS_RE = re.compile(rb"try again in (\d+)ms", re.IGNORECASE)
 
 def _sleep_from_retry_headers(r):
     # prefer 'retry-after' header (seconds) if present
@@ -30,10 +551,12 @@ def _sleep_from_retry_headers(r):
             return float(retry_after)
         except Exception:
             pass
-    # fallback: attempt to parse ms from message like "Please try again in 420ms"
-    body = (r.text or "").lower()
-    import re
-    m = re.search(r"try again in (\d+)ms", body)
+    # next: structured token-bucket reset header like "7.66s" or "2m30s"
+    reset = _parse_duration(r.headers.get("x-ratelimit-reset-tokens"))
+    if reset is not None:
+        return reset + 0.05
+    # last resort: parse ms from a body message like "Please try again in 420ms"
+    m = _RETRY_MS_RE.search(r.content or b"")
     if m:
         try:
             return int(m.group(1)) / 1000.0 + 0.05
@@ -42,9 +565,44 @@ def _sleep_from_retry_headers(r):
     # final fallback: short backoff
     return 1.0
 
-@retry(wait=wait_exponential(multiplier=0.5, min=0.5, max=10), stop=stop_after_attempt(4),
-       retry=retry_if_exception_type((requests.exceptions.RequestException,)))
-def call_groq_once(prompt_seed: str, kb:int=1, model=DEFAULT_MODEL, max_tokens=None):
+_backoff = wait_exponential(multiplier=0.5, min=0.5, max=10)
+
+def _wait_for_retry(retry_state):
+    """429s wait exactly as long as the server asks; other failures back off exponentially."""
+    exc = retry_state.outcome.exception()
+    if isinstance(exc, httpx.HTTPStatusError) and exc.response.status_code == 429:
+        sleep_for = _sleep_from_retry_headers(exc.response)
+        print(f"[groq] 429 rate-limit — sleeping {sleep_for}s (retry-after header or server message).")
+        return sleep_for
+    return _backoff(retry_state)
+
+async def post_groq(payload, timeout=120, attempts=4):
+    """
+    POST a chat-completion payload, paced by the token bucket. Retries run on the event loop,
+    so a backing-off request never blocks the others. Returns the 2xx response.
+    """
+    async for attempt in AsyncRetrying(wait=_wait_for_retry, stop=stop_after_attempt(attempts),
+                                       retry=retry_if_exception_type(httpx.HTTPError), reraise=True):
+        with attempt:
+            await _token_bucket.acquire(_estimate_tokens(payload))
+            r = await get_client().post(GROQ_API_URL, content=orjson.dumps(payload), timeout=timeout)
+            _token_bucket.update_from_headers(r.headers)
+            _limiter.observe(r)
+            if r.status_code != 429 and not (200 <= r.status_code < 300):
+                # print debug and raise
+                print("=== GROQ CALL FAILED ===")
+                print("Status:", r.status_code)
+                print("Response headers:", dict(r.headers))
+                print("Response body:", r.text[:2000])
+            r.raise_for_status()
+    return r
+
+async def call_groq_once(prompt_seed: str, kb:int=1, model=DEFAULT_MODEL, max_tokens=None, variant=0, use_cache=True, locale="ta-IN"):
+    """
+    Returns (body bytes, headers). Cache hits return the stored body with empty headers
+    (no request was made, so there is no rate-limit information). The body is left
+    unparsed: the caller decodes it exactly once.
+    """
     instruction = (
         f"Generate a single long visitor message (~{kb} KB) for testing a customer support chatbot. "
         "Include Tamil text, emojis, some repeated characters, optionally a small code snippet and a small JSON block. "
@@ -54,70 +612,69 @@ def call_groq_once(prompt_seed: str, kb:int=1, model=DEFAULT_MODEL, max_tokens=N
         {"role":"system", "content": "You are a test-case generator."},
         {"role":"user", "content": instruction + "\nSeed: " + prompt_seed}
     ]
-    if max_tokens is None:
-        max_tokens = _tokens_for_kb(kb)
+    sized = max_tokens is None
+    if sized:
+        max_tokens = _tokens_for_kb(kb, locale)
     payload = {"model": model, "messages": messages, "max_tokens": max_tokens}
-    r = requests.post(GROQ_API_URL, json=payload, headers=HEADERS, timeout=120)
+    key = _cache_key(payload, variant, kb, locale) if sized else _cache_key(payload, variant)
+    if use_cache:
+        cached = cache_get(key)
+        if cached is not None:
+            return cached, {}
+    r = await post_groq(payload)
 
-    # handle 429 specially — return helpful info to caller
-    if r.status_code == 429:
-        sleep_for = _sleep_from_retry_headers(r)
-        print(f"[groq] 429 rate-limit — sleeping {sleep_for}s (retry-after header or server message).")
-        time.sleep(sleep_for)
-        # raise to let tenacity retry (or caller can loop)
-        r.raise_for_status()
-
-    if not (200 <= r.status_code < 300):
-        # print debug and raise
-        print("=== GROQ CALL FAILED ===")
-        print("Status:", r.status_code)
-        print("Response headers:", dict(r.headers))
-        print("Response body:", r.text[:2000])
-        r.raise_for_status()
+    if use_cache:
+        cache_put(key, r.content)
+    return r.content, r.headers
 
-    return r
-
-def generate_bulk_rate_safe(seeds, per_seed=1, kb=1, out_file="generated_messages.json", throttle_delay=0.5, safety_token_threshold=200):
+async def generate_bulk_rate_safe(seeds, per_seed=1, kb=1, out_file="generated_messages.jsonl", throttle_delay=0.5, safety_token_threshold=200, concurrency=16, use_cache=True, locale="ta-IN"):
     """
-    Generates messages but respects per-minute token limits using headers and server 429.
-    throttle_delay: minimal delay between requests (seconds)
+    Generates messages but respects per-minute token limits via the shared token bucket and server 429.
+    throttle_delay: back-off after a failed request (seconds)
     safety_token_threshold: stop if x-ratelimit-remaining-tokens <= threshold
+    concurrency: upper bound for the adaptive number of requests in flight
+    use_cache: answer repeated (seed, i) requests from the on-disk cache; such records are
+               tagged "cached": true, since the output is appended to and would otherwise hold silent duplicates
+    locale: sizes max_tokens from that locale's bytes/token (the prompt asks for Tamil text)
     """
-    out = []
-    tokens_per_req = _tokens_for_kb(kb)
-    estimated_req_per_min = None
+    tokens_per_req = _tokens_for_kb(kb, locale)
     print(f"[groq] tokens per request (approx): {tokens_per_req}")
 
-    for s in seeds:
-        for i in range(per_seed):
+    _limiter.ceiling = concurrency
+    # set once remaining tokens fall under the threshold; pending workers then skip their call
+    stop = asyncio.Event()
+
+    async def _one(s, i):
+        async with _limiter:
+            if stop.is_set():
+                return None
             print(f"[groq] generating for seed='{s}' ({i+1}/{per_seed})")
             try:
-                r = call_groq_once(s, kb=kb)
+                body, headers = await call_groq_once(s, kb=kb, variant=i, use_cache=use_cache, locale=locale)
             except Exception as e:
                 print("[groq] error calling groq:", repr(e))
-                out.append({"seed": s, "visitor_message": None, "error": str(e)})
-                # short sleep before next to avoid tight retry loops
-                time.sleep(max(1.0, throttle_delay))
-                continue
+                # short sleep before releasing the slot to avoid tight retry loops
+                await asyncio.sleep(max(1.0, throttle_delay))
+                return {"seed": s, "visitor_message": None, "error": str(e)}
 
             # successful response
             try:
-                resp = r.json()
+                resp = orjson.loads(body)
             except Exception:
-                text = r.text
-                out.append({"seed": s, "visitor_message": text})
+                text = body.decode("utf-8", "replace")
                 # inspect headers for rate-limit signals
-                remaining_tokens = r.headers.get("x-ratelimit-remaining-tokens")
+                remaining_tokens = headers.get("x-ratelimit-remaining-tokens")
                 if remaining_tokens:
                     remaining_tokens = float(remaining_tokens)
                     print(f"[groq] remaining tokens: {remaining_tokens}")
                     if remaining_tokens <= safety_token_threshold:
                         print(f"[groq] remaining tokens {remaining_tokens} <= safety threshold {safety_token_threshold}: stopping early.")
-                        with open(out_file, "w", encoding="utf-8") as f:
-                            json.dump(out, f, ensure_ascii=False, indent=2)
-                        return out_file
-                time.sleep(throttle_delay)
-                continue
+                        stop.set()
+                return {"seed": s, "visitor_message": text, "cached": not headers}
+
+            if headers:
+                # fresh response (cache hits come back without headers)
+                record_usage(locale, resp)
 
             # parse the assistant content
             text = None
@@ -131,38 +688,24 @@ def generate_bulk_rate_safe(seeds, per_seed=1, kb=1, out_file="generated_message
                     elif isinstance(msg, str):
                         text = msg
             if not text:
-                text = json.dumps(resp)
-            out.append({"seed": s, "visitor_message": text})
+                text = orjson.dumps(resp).decode()
 
-            # check rate-limit headers and act
-            remaining_tokens = r.headers.get("x-ratelimit-remaining-tokens")
+            # pacing is handled by the token bucket in post_groq; just report
+            remaining_tokens = headers.get("x-ratelimit-remaining-tokens")
             if remaining_tokens:
-                try:
-                    remaining_tokens = float(remaining_tokens)
-                    print(f"[groq] remaining tokens after request: {remaining_tokens}")
-                    # if we are close to limit, pause until reset window (we can read reset header or use safe sleep)
-                    if remaining_tokens <= safety_token_threshold:
-                        reset_info = r.headers.get("x-ratelimit-reset-tokens")
-                        print(f"[groq] remaining tokens low ({remaining_tokens}). Header x-ratelimit-reset-tokens: {reset_info}")
-                        # parse reset seconds if present in header like "59.34s" or "2m30s"
-                        if reset_info and "s" in reset_info:
-                            # try to parse float seconds
-                            try:
-                                sec = float(reset_info.replace("s",""))
-                            except:
-                                sec = 60
-                        else:
-                            sec = 60
-                        wait = sec + 1.0
-                        print(f"[groq] sleeping for {wait}s to allow token bucket to replenish.")
-                        time.sleep(wait)
-                except Exception:
-                    pass
-
-            # small inter-request delay to avoid bursts
-            time.sleep(throttle_delay)
-
-    with open(out_file, "w", encoding="utf-8") as f:
-        json.dump(out, f, ensure_ascii=False, indent=2)
-    print("Wrote", out_file)
+                print(f"[groq] remaining tokens after request: {remaining_tokens}")
+
+            return {"seed": s, "visitor_message": text, "cached": not headers}
+
+    async def _write(s, i):
+        record = await _one(s, i)
+        if record is not None:
+            writer.write(record, flush="error" in record)
+
+    with JsonlWriter(out_file) as writer:
+        try:
+            await asyncio.gather(*[_write(s, i) for s in seeds for i in range(per_seed)])
+        finally:
+            save_calibration()
+    print("Appended", writer.count, "entries to", out_file, "(total entries now:", count_records(out_file), ")")
     return out_file
@@ -1,5 +1,5 @@
 # run_bulk_direct.py
-from TestcaseTokens import generate_bulk_rate_safe
+from TestcaseTokens import generate_bulk_rate_safe, run
 
 seeds = [
     "FAQ about warranty + order lookup + long complaint (Tamil + English)",
@@ -11,7 +11,10 @@ seeds = [
 # tune these:
 PER_SEED = 25        # messages per seed -> total = len(seeds)*PER_SEED
 KB = 1               # ~1 KB each (adjust smaller/larger)
-THROTTLE = 3.0       # seconds delay between requests (see note below)
-OUT = "generated_messages.json"
+THROTTLE = 3.0       # seconds to back off after a failed request
+CONCURRENCY = 16     # upper bound on requests in flight (adapts from 2 based on rate-limit headers)
+OUT = "generated_messages.jsonl"
+USE_CACHE = True     # False always calls Groq; with True a rerun appends the same (cached) messages again
 
-generate_bulk_rate_safe(seeds, per_seed=PER_SEED, kb=KB, out_file=OUT, throttle_delay=THROTTLE)
+run(generate_bulk_rate_safe(seeds, per_seed=PER_SEED, kb=KB, out_file=OUT,
+                            throttle_delay=THROTTLE, concurrency=CONCURRENCY, use_cache=USE_CACHE))